@@ -9,18 +9,38 @@ This script combines both workflows into one tool.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import plistlib
 import json
+import io
+import mmap
 import unicodedata
 import re
 import time
 import os
 import random
 import sys
-import copy
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
+try:
+    import requests_cache
+except ImportError:  # optional: lookups just aren't cached between runs
+    requests_cache = None
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json module
+    orjson = None
+
+try:
+    import biplist
+except ImportError:  # optional: only speeds up binary-format libraries
+    biplist = None
+
 # ══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ══════════════════════════════════════════════════════════════════════════════
@@ -28,29 +48,52 @@ from pathlib import Path
 LIBRARY_FILENAME = "365_library.xml"
 PLAYLIST_NAME = "PID:BBE2197D42966E62"  # Use PID: prefix to search by Persistent ID
 CHECKPOINT_FILE = "progress_checkpoint.json"
+CHECKPOINT_WAL = CHECKPOINT_FILE + ".wal"  # one JSON line per day since the last full save
 FINAL_FILE = "assets/calendar_data.js"
 SKIPPED_SONGS_FILE = "skipped_songs.json"
 PINS_FILE = "song_pins.json"
+NOT_FOUND_FILE = "not_found.json"  # songs iTunes had no results for
 EXPECTED_DAYS = 365
 START_DATE = date(2026, 2, 14)  # Day 1 of your calendar
+ITUNES_CACHE_FILE = "itunes_cache.sqlite"
+ITUNES_CACHE_EXPIRE = timedelta(days=30)
+LOOKUP_WORKERS = 4  # iTunes lookups allowed in flight at once
+
+# One session for every iTunes lookup. With requests-cache installed, successful
+# responses are kept on disk so re-runs don't hit the API again.
+if requests_cache:
+    SESSION = requests_cache.CachedSession(
+        ITUNES_CACHE_FILE,
+        expire_after=ITUNES_CACHE_EXPIRE,
+        allowable_codes=(200,),
+        allowable_methods=('GET',),
+    )
+else:
+    SESSION = requests.Session()
+# Keep TLS connections to itunes.apple.com open across lookups; pool is sized
+# above LOOKUP_WORKERS so no thread waits on a connection.
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PART 1: CALENDAR BUILDER FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════════
 
+@functools.lru_cache(maxsize=1)
 def find_library_file():
-    """Cross-platform library file finder"""
-    possible_paths = [
+    """Cross-platform library file finder (set ITUNES_LIBRARY_XML to skip the search)"""
+    env_path = os.environ.get('ITUNES_LIBRARY_XML', '').strip()
+    possible_paths = [Path(env_path)] if env_path else []
+    possible_paths += [
         Path.home() / "Music" / LIBRARY_FILENAME,
         Path.home() / "Music" / "iTunes" / LIBRARY_FILENAME,
         Path.home() / "Music" / "Music" / "Library" / LIBRARY_FILENAME,
         Path(LIBRARY_FILENAME),  # Current directory
     ]
     
-    for path in possible_paths:
-        if path.exists():
-            print(f"✅ Found library: {path}")
-            return str(path)
+    match = next((p for p in possible_paths if p.exists()), None)
+    if match:
+        print(f"✅ Found library: {match}")
+        return str(match)
     
     print("❌ Could not find library file automatically.")
     manual_path = input(f"Please enter the full path to {LIBRARY_FILENAME}: ").strip()
@@ -59,6 +102,11 @@ def find_library_file():
     raise FileNotFoundError(f"Library file not found: {manual_path}")
 
 
+_RE_NON_ALNUM = re.compile(r'[^a-z0-9\-]')
+_RE_DASHES = re.compile(r'-+')
+
+
+@functools.lru_cache(maxsize=1024)
 def normalize(text):
     """Improved normalization that preserves more characters"""
     if not text:
@@ -67,21 +115,145 @@ def normalize(text):
     text = ''.join(c for c in text if not unicodedata.combining(c))
     text = text.lower()
     text = text.replace(" ", "-")
-    text = re.sub(r'[^a-z0-9\-]', '', text)
-    text = re.sub(r'-+', '-', text).strip('-')
+    text = _RE_NON_ALNUM.sub('', text)
+    text = _RE_DASHES.sub('-', text).strip('-')
     return text
 
 
+# Shared pacing for every lookup thread: requests are handed out one slot at a
+# time, 3-6.5s apart, with a 45-90s break every 25 calls.
+_api_lock = threading.Lock()
+_api_state = {"next_at": 0.0, "calls": 0, "blocked_until": 0.0}
+_lookups_cancelled = threading.Event()
+
+
+def wait_for_api_slot():
+    """Block until this thread may send the next iTunes request.
+
+    Returns False if the build was cancelled while waiting. A thread whose
+    slot comes up inside a defer_api_calls backoff queues again behind it.
+    """
+    first_try = True
+    while True:
+        with _api_lock:
+            now = time.monotonic()
+            start = max(now, _api_state["next_at"])
+            gap = random.uniform(3.0, 6.5)
+            if first_try:
+                _api_state["calls"] += 1
+                if _api_state["calls"] % 25 == 0:
+                    long_break = random.randint(45, 90)
+                    print(f"\n☕ API call #{_api_state['calls']} - Taking a {long_break}s break...\n")
+                    gap += long_break
+            _api_state["next_at"] = start + gap
+        first_try = False
+        if _lookups_cancelled.wait(start - now):
+            return False
+        with _api_lock:
+            if _api_state["blocked_until"] <= start:
+                return True
+
+
+def defer_api_calls(seconds):
+    """Hold every lookup thread off for `seconds`, including ones already waiting"""
+    with _api_lock:
+        until = time.monotonic() + seconds
+        _api_state["blocked_until"] = max(_api_state["blocked_until"], until)
+        _api_state["next_at"] = max(_api_state["next_at"], until)
+
+
+def json_bytes(obj, indent=True):
+    """Serialize to UTF-8 JSON, 2-space indented or on one line (orjson when installed)"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_json(f, obj):
+    """Write 2-space-indented JSON to a binary file without building a str first"""
+    if orjson:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        # json.dump encodes chunk by chunk straight into the file's buffer
+        text = io.TextIOWrapper(f, encoding='utf-8', write_through=True)
+        json.dump(obj, text, indent=2, ensure_ascii=False)
+        text.detach()
+
+
+def json_from_bytes(raw):
+    """Parse JSON from bytes (orjson when installed); raises json.JSONDecodeError"""
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def load_not_found():
+    """Load the (song, artist) pairs iTunes already returned no results for"""
+    if os.path.exists(NOT_FOUND_FILE):
+        try:
+            with open(NOT_FOUND_FILE, 'rb') as f:
+                return {tuple(pair) for pair in json_from_bytes(f.read())}
+        except (json.JSONDecodeError, TypeError):
+            print("⚠️  Not-found cache corrupted, ignoring it")
+    return set()
+
+
+def remember_not_found(key):
+    """Record a no-results lookup and save the set atomically"""
+    with _not_found_lock:
+        _NOT_FOUND.add(key)
+        temp_file = NOT_FOUND_FILE + ".tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(json_bytes(sorted(_NOT_FOUND)))
+            os.replace(temp_file, NOT_FOUND_FILE)
+        except Exception as e:
+            print(f"⚠️  Error saving not-found cache: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+
+_NOT_FOUND = load_not_found()
+_not_found_lock = threading.Lock()
+
+
+def forget_cached_response(url):
+    """Drop a cached response so a bad lookup isn't replayed on the next run"""
+    if requests_cache:
+        SESSION.cache.delete(urls=[url])
+
+
+def _load_plist(xml_path):
+    """Parse the library and return (tracks, playlists); everything else is dropped"""
+    with open(xml_path, 'rb') as f:
+        if biplist and f.read(8) == b'bplist00':
+            plist = biplist.readPlist(xml_path)
+        else:
+            f.seek(0)
+            plist = plistlib.load(f)
+    return plist['Tracks'], plist['Playlists']
+
+
 def parse_playlist_to_dicts(xml_path, playlist_name):
     """Parse playlist with duplicate detection - uses the playlist with most songs if multiple matches
     
     If playlist_name starts with 'PID:', it's treated as a Persistent ID lookup instead.
     Example: 'PID:BBE2197D42966E62' will find the playlist with that exact PID.
+    
+    The result is memoized per library mtime, so later menu actions don't re-parse.
     """
-    with open(xml_path, 'rb') as f:
-        plist = plistlib.load(f)
+    songs = _parsed_playlist((xml_path, os.path.getmtime(xml_path)), playlist_name)
+    # Copies, so callers can annotate songs without touching the cached ones
+    return [dict(song) for song in songs]
 
-    tracks = plist['Tracks']
+
+@functools.lru_cache(maxsize=4)
+def _parsed_playlist(xml_path_and_mtime, playlist_name):
+    """Uncached body of parse_playlist_to_dicts; the mtime only keys the cache"""
+    xml_path, _ = xml_path_and_mtime
+    tracks, playlists = _load_plist(xml_path)
     
     # Check if we're searching by PID instead of name
     search_by_pid = playlist_name.startswith('PID:')
@@ -92,7 +264,7 @@ def parse_playlist_to_dicts(xml_path, playlist_name):
         
         # Find playlist by PID
         found_playlist = None
-        for pl in plist['Playlists']:
+        for pl in playlists:
             if pl.get('Playlist Persistent ID') == target_pid:
                 found_playlist = pl
                 break
@@ -107,7 +279,7 @@ def parse_playlist_to_dicts(xml_path, playlist_name):
     else:
         # Original name-based search logic
         matching_playlists = []
-        for pl in plist['Playlists']:
+        for pl in playlists:
             current_pl_name = str(pl.get('Name', '')).strip()
             if current_pl_name == playlist_name:
                 playlist_items = pl.get('Playlist Items', [])
@@ -156,9 +328,20 @@ def parse_playlist_to_dicts(xml_path, playlist_name):
     return playlist_data
 
 
-def get_apple_music_id(song_name, artist_name, album_name, retry_count=0):
-    """Improved API call with better matching and error handling"""
-    query = f"{song_name} {artist_name}".replace(" ", "+")
+def get_apple_music_id(song_name, artist_name, album_name):
+    """Improved API call with better matching and error handling
+
+    Returns (result, was_cached); was_cached is True when no request went out.
+    """
+    norm_song = song_name.lower().strip()
+    norm_artist = artist_name.lower().strip()
+    norm_album = album_name.lower().strip()
+    
+    if (norm_song, norm_artist) in _NOT_FOUND:
+        return {"error": "cached_no_results", "id": None}, True
+    
+    # Lowercase/strip so the same song always maps to the same URL (and cache entry)
+    query = f"{song_name} {artist_name}".lower().strip().replace(" ", "+")
     url = f"https://itunes.apple.com/search?term={query}&entity=song&limit=10"
     
     user_agents = [
@@ -168,33 +351,59 @@ def get_apple_music_id(song_name, artist_name, album_name, retry_count=0):
     ]
     headers = { 'User-Agent': random.choice(user_agents) }
     
+    was_cached = False
     try:
-        response = requests.get(url, headers=headers, timeout=20)
-
-        if response.status_code == 429 or response.status_code == 403:
-            if retry_count >= 5:
-                print(f"  ❌ Failed after 5 retries")
-                return {"error": "rate_limit_exceeded", "id": None}
-            
-            wait_time = min(300, (2 ** retry_count) * 30)
-            print(f"  ⚠️  Rate limited! Waiting {wait_time}s... (attempt {retry_count + 1}/5)")
-            time.sleep(wait_time)
-            return get_apple_music_id(song_name, artist_name, album_name, retry_count + 1)
+        # Attempts 0-5; rate limits can use all of them, timeouts the first 4
+        for attempt in range(6):
+            response = None
+            if requests_cache:
+                # Known queries come straight off disk and don't need an API slot.
+                # Only 200s are cached, so anything else (a 504) means "not cached".
+                response = SESSION.get(url, headers=headers, timeout=20, only_if_cached=True)
+                if response.status_code != 200:
+                    response = None
+            if response is None:
+                if not wait_for_api_slot():
+                    return {"error": "cancelled", "id": None}, False
+                try:
+                    response = SESSION.get(url, headers=headers, timeout=20)
+                except requests.Timeout:
+                    print(f"  ⚠️  Timeout - retrying...")
+                    if attempt < 3:
+                        if _lookups_cancelled.wait(5):
+                            return {"error": "cancelled", "id": None}, False
+                        continue
+                    return {"error": "timeout", "id": None}, False
+            was_cached = bool(getattr(response, 'from_cache', False))
+
+            if response.status_code == 429 or response.status_code == 403:
+                forget_cached_response(url)
+                if attempt >= 5:
+                    print(f"  ❌ Failed after 5 retries")
+                    return {"error": "rate_limit_exceeded", "id": None}, was_cached
+                
+                wait_time = min(300, (2 ** attempt) * 30)
+                print(f"  ⚠️  Rate limited! Waiting {wait_time}s... (attempt {attempt + 1}/5)")
+                defer_api_calls(wait_time)
+                continue
+            break
 
         if response.status_code != 200:
-            return {"error": f"http_{response.status_code}", "id": None}
+            forget_cached_response(url)
+            return {"error": f"http_{response.status_code}", "id": None}, was_cached
         
-        data = response.json()
+        try:
+            data = response.json()
+        except ValueError:
+            forget_cached_response(url)
+            raise
         
         if data.get('resultCount', 0) == 0:
-            return {"error": "no_results", "id": None}
+            remember_not_found((norm_song, norm_artist))
+            return {"error": "no_results", "id": None}, was_cached
         
         results = data['results']
         
-        norm_song = song_name.lower().strip()
-        norm_artist = artist_name.lower().strip()
-        norm_album = album_name.lower().strip()
-        
         best_match = None
         best_score = 0
         
@@ -223,6 +432,8 @@ def get_apple_music_id(song_name, artist_name, album_name, retry_count=0):
             if score > best_score:
                 best_score = score
                 best_match = result
+                if best_score >= 18:  # exact song, artist and album - can't do better
+                    break
         
         if best_match:
             match_quality = "High Confidence" if best_score >= 15 else "Medium Confidence" if best_score >= 8 else "Low Confidence"
@@ -233,7 +444,7 @@ def get_apple_music_id(song_name, artist_name, album_name, retry_count=0):
                 "official_album": best_match.get('collectionName'),
                 "match_quality": match_quality,
                 "match_score": best_score
-            }
+            }, was_cached
         
         return {
             "id": results[0].get('trackId'),
@@ -242,17 +453,11 @@ def get_apple_music_id(song_name, artist_name, album_name, retry_count=0):
             "official_album": results[0].get('collectionName'),
             "match_quality": "Fallback",
             "match_score": 0
-        }
+        }, was_cached
         
-    except requests.Timeout:
-        print(f"  ⚠️  Timeout - retrying...")
-        if retry_count < 3:
-            time.sleep(5)
-            return get_apple_music_id(song_name, artist_name, album_name, retry_count + 1)
-        return {"error": "timeout", "id": None}
     except Exception as e:
         print(f"  ⚠️  Error: {type(e).__name__}: {e}")
-        return {"error": str(e), "id": None}
+        return {"error": str(e), "id": None}, was_cached
 
 
 def convert_to_links(name, id):
@@ -274,35 +479,71 @@ def validate_embed(url):
 
 
 def load_checkpoint():
-    """Load checkpoint with error handling"""
+    """Load checkpoint with error handling, then replay the day log on top"""
+    data = {}
     if os.path.exists(CHECKPOINT_FILE):
         try:
-            with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(CHECKPOINT_FILE, 'rb') as f:
+                data = json_from_bytes(f.read())
         except json.JSONDecodeError:
             print("⚠️  Checkpoint file corrupted, starting fresh")
-            return {}
-    return {}
+    data.update(read_checkpoint_log())
+    return data
+
+
+def read_checkpoint_log():
+    """Return the days appended to CHECKPOINT_WAL since the last full save"""
+    days = {}
+    if os.path.exists(CHECKPOINT_WAL):
+        with open(CHECKPOINT_WAL, 'rb') as f:
+            for line in f:
+                try:
+                    days.update(json_from_bytes(line))
+                except json.JSONDecodeError:
+                    continue  # line torn by a crash mid-write
+    return days
+
+
+def append_checkpoint(day_key, details):
+    """Append one finished day to the checkpoint log and fsync it"""
+    with open(CHECKPOINT_WAL, 'a+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                f.write(b"\n")  # end a torn line so it doesn't swallow this one
+        f.write(json_bytes({day_key: details}, indent=False) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
 
 
 def save_checkpoint(data):
-    """Save checkpoint atomically"""
+    """Save checkpoint atomically (compact) and clear the day log; call whenever FINAL_FILE is rewritten"""
     temp_file = CHECKPOINT_FILE + ".tmp"
     try:
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(temp_file, 'wb') as f:
+            f.write(json_bytes(data, indent=False))
         os.replace(temp_file, CHECKPOINT_FILE)
+        if os.path.exists(CHECKPOINT_WAL):
+            os.remove(CHECKPOINT_WAL)
     except Exception as e:
         print(f"⚠️  Error saving checkpoint: {e}")
         if os.path.exists(temp_file):
             os.remove(temp_file)
 
 
+def clear_checkpoint():
+    """Delete the checkpoint and its day log (used before a rebuild)"""
+    for path in (CHECKPOINT_FILE, CHECKPOINT_WAL):
+        if os.path.exists(path):
+            os.remove(path)
+
+
 def save_skipped_songs(skipped_list):
     """Save list of skipped songs for manual review"""
     try:
-        with open(SKIPPED_SONGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(skipped_list, f, indent=2, ensure_ascii=False)
+        with open(SKIPPED_SONGS_FILE, 'wb') as f:
+            f.write(json_bytes(skipped_list))
         print(f"📝 Saved {len(skipped_list)} skipped songs to {SKIPPED_SONGS_FILE}")
     except Exception as e:
         print(f"⚠️  Error saving skipped songs: {e}")
@@ -339,6 +580,7 @@ def save_to_js(song_data, filename=FINAL_FILE):
             if response.lower() != 'y':
                 raise
 
+    _load_data_cached.cache_clear()
     json_string = json.dumps(song_data, indent=4, ensure_ascii=False)
     js_content = f"const loveData = {json_string};"
     
@@ -387,7 +629,7 @@ def build_calendar():
     if os.path.exists(FINAL_FILE):
         try:
             print(f"📂 Loading existing calendar from {FINAL_FILE}...")
-            data, _, _ = load_data(FINAL_FILE)
+            data, _, _ = load_data_for_update(FINAL_FILE)
             json_data = data
             print(f"✅ Loaded {len(json_data)} existing days")
         except Exception as e:
@@ -397,6 +639,12 @@ def build_calendar():
     # Fall back to checkpoint if calendar file didn't work
     if not json_data:
         json_data = load_checkpoint()
+    else:
+        # Days a previous run finished after the calendar file was last written
+        # (every rewrite of FINAL_FILE goes through save_checkpoint, which
+        # empties the log)
+        for day_key, details in read_checkpoint_log().items():
+            json_data.setdefault(day_key, details)
     
     existing_days = len(json_data)
     skipped_songs = []
@@ -409,23 +657,20 @@ def build_calendar():
     
     api_call_count = 0
     
+    # Lookups run LOOKUP_WORKERS at a time (paced by wait_for_api_slot);
+    # pool.map hands results back in playlist order so days stay in sequence.
+    songs_to_add = song_list[existing_days:EXPECTED_DAYS]
+    _lookups_cancelled.clear()
+    pool = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS)
+    lookups = pool.map(
+        lambda s: get_apple_music_id(s['name'], s['artist'], s['album']),
+        songs_to_add,
+    )
+    
     try:
-        for day_num in range(existing_days + 1, EXPECTED_DAYS + 1):
-            song_index = day_num - 1
-            
-            if song_index >= len(song_list):
-                print(f"\n⚠️  Ran out of songs! Only have {len(song_list)} songs for {EXPECTED_DAYS} days")
-                break
-            
-            song = song_list[song_index]
-            
-            if api_call_count > 0 and api_call_count % 25 == 0:
-                long_break = random.randint(45, 90)
-                print(f"\n☕ API call #{api_call_count} - Taking a {long_break}s break...\n")
-                time.sleep(long_break)
-            
-            id_data = get_apple_music_id(song['name'], song['artist'], song['album'])
-            api_call_count += 1
+        for day_num, (song, (id_data, was_cached)) in enumerate(zip(songs_to_add, lookups), existing_days + 1):
+            if not was_cached:
+                api_call_count += 1
             
             if id_data and id_data.get('id'):
                 song_id = id_data['id']
@@ -473,25 +718,26 @@ def build_calendar():
                 })
                 continue
             
-            if day_num % 10 == 0:
-                save_checkpoint(json_data)
-                print(f"💾 Checkpoint: Day {day_num} saved")
-            
-            if day_num < EXPECTED_DAYS:
-                wait_time = random.uniform(3.0, 6.5)
-                time.sleep(wait_time)
+            append_checkpoint(f"day{day_num}", details)
+        
+        if existing_days + len(songs_to_add) < EXPECTED_DAYS:
+            print(f"\n⚠️  Ran out of songs! Only have {len(song_list)} songs for {EXPECTED_DAYS} days")
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted! Saving progress...")
-        save_checkpoint(json_data)
         if skipped_songs:
             save_skipped_songs(skipped_songs)
         save_to_js(json_data, FINAL_FILE)
+        save_checkpoint(json_data)
         print(f"💾 Saved {len(json_data)} days")
         return False
+    finally:
+        # Don't leave queued lookups running (or sleeping) after we stop
+        _lookups_cancelled.set()
+        pool.shutdown(wait=False, cancel_futures=True)
     
-    save_checkpoint(json_data)
     save_to_js(json_data, FINAL_FILE)
+    save_checkpoint(json_data)
     
     if skipped_songs:
         save_skipped_songs(skipped_songs)
@@ -512,6 +758,25 @@ def build_calendar():
     return True
 
 
+def is_interactive():
+    """True when someone is at a terminal (stdin is a TTY, CALENDAR_NONINTERACTIVE unset)"""
+    return sys.stdin.isatty() and not os.environ.get("CALENDAR_NONINTERACTIVE")
+
+
+def pause():
+    """Wait for Enter before going on, skipped when not interactive"""
+    if is_interactive():
+        input("\nPress Enter to continue...")
+
+
+def offer_pin_and_randomize():
+    """Offer to go on to PART 2 after a build; scripted runs answer no"""
+    if is_interactive():
+        cont = input("\nContinue to Pin & Randomize? (y/n): ").strip().lower()
+        if cont == "y":
+            pin_and_randomize_menu()
+
+
 def show_remaining_songs():
     """Show which songs from playlist are not yet in the calendar"""
     print("\n" + "="*80)
@@ -586,7 +851,7 @@ def show_remaining_songs():
         except Exception as e:
             print(f"⚠️  Could not save remaining songs file: {e}")
     
-    input("\nPress Enter to continue...")
+    pause()
 
 
 def clean_calendar_from_playlist():
@@ -611,7 +876,7 @@ def clean_calendar_from_playlist():
         return
     
     try:
-        data, js_prefix, js_suffix = load_data(FINAL_FILE)
+        data, js_prefix, js_suffix = load_data_for_update(FINAL_FILE)
         print(f"✅ Loaded calendar with {len(data)} days\n")
     except Exception as e:
         print(f"❌ Error loading calendar: {e}")
@@ -623,57 +888,56 @@ def clean_calendar_from_playlist():
         """Normalize text for matching - lowercase and strip whitespace"""
         return text.lower().strip() if text else ""
     
-    playlist_songs = set()
-    playlist_pid_map = {}  # Map (name, artist) -> new PID for updating
-    
+    # Normalize each playlist song once, then map (name, artist) -> current PID;
+    # the map doubles as the membership test
     for song in song_list:
-        name_norm = normalize_for_match(song['name'])
-        artist_norm = normalize_for_match(song['artist'])
-        key = (name_norm, artist_norm)
-        playlist_songs.add(key)
-        playlist_pid_map[key] = song['PID']
-    
-    # Find songs in calendar that are NOT in playlist (by name+artist)
-    # Also track songs that need PID updates
-    songs_to_remove = []
-    songs_to_update_pid = []
+        song['_key'] = (normalize_for_match(song['name']), normalize_for_match(song['artist']))
+    playlist_pid_map = {song['_key']: song['PID'] for song in song_list}
+    
+    # (name, artist) for every calendar day, raw for display and normalized as
+    # playlist_pid_map keys
+    calendar_songs = {
+        day_key: (day_data.get('metadata', {}).get('original_name', '?'),
+                  day_data.get('metadata', {}).get('original_artist', '?'))
+        for day_key, day_data in data.items()
+    }
+    calendar_keys = {
+        day_key: (normalize_for_match(name), normalize_for_match(artist))
+        for day_key, (name, artist) in calendar_songs.items()
+    }
+    
+    # Songs in calendar that are NOT in playlist (by name+artist), and songs
+    # whose PID changed in the library
+    days_to_remove = [day for day, key in calendar_keys.items() if key not in playlist_pid_map]
+    days_to_update = [
+        (day, new_pid) for day, key in calendar_keys.items()
+        if (new_pid := playlist_pid_map.get(key)) is not None and new_pid != data[day].get('PID')
+    ]
     
-    for day_key, day_data in data.items():
-        metadata = day_data.get('metadata', {})
-        cal_name = metadata.get('original_name', '?')
-        cal_artist = metadata.get('original_artist', '?')
-        cal_pid = day_data.get('PID')
-        
-        # Normalize for matching
-        name_norm = normalize_for_match(cal_name)
-        artist_norm = normalize_for_match(cal_artist)
-        key = (name_norm, artist_norm)
-        
-        # Check if song exists in playlist
-        if key not in playlist_songs:
-            # Song not found in playlist - mark for removal
-            songs_to_remove.append({
-                'day': day_key,
-                'name': cal_name,
-                'artist': cal_artist,
-                'PID': cal_pid
-            })
-        else:
-            # Song exists - check if PID needs updating
-            new_pid = playlist_pid_map.get(key)
-            if new_pid and new_pid != cal_pid:
-                songs_to_update_pid.append({
-                    'day': day_key,
-                    'name': cal_name,
-                    'artist': cal_artist,
-                    'old_PID': cal_pid,
-                    'new_PID': new_pid
-                })
+    songs_to_remove = [
+        {
+            'day': day,
+            'name': calendar_songs[day][0],
+            'artist': calendar_songs[day][1],
+            'PID': data[day].get('PID')
+        }
+        for day in days_to_remove
+    ]
+    songs_to_update_pid = [
+        {
+            'day': day,
+            'name': calendar_songs[day][0],
+            'artist': calendar_songs[day][1],
+            'old_PID': data[day].get('PID'),
+            'new_PID': new_pid
+        }
+        for day, new_pid in days_to_update
+    ]
     
     # Display results
     if not songs_to_remove and not songs_to_update_pid:
         print("✅ All songs in calendar match the playlist perfectly - nothing to do!")
-        input("\nPress Enter to continue...")
+        pause()
         return
     
     # Show songs that will be removed
@@ -737,7 +1001,7 @@ def clean_calendar_from_playlist():
             print(f"     PID: {song['PID']}")
         if len(song_list) > 20:
             print(f"\n... and {len(song_list) - 20} more songs")
-        input("\nPress Enter to continue...")
+        pause()
         return
     
     if choice != "1":
@@ -763,34 +1027,26 @@ def clean_calendar_from_playlist():
         for song in songs_to_update_pid:
             day_key = song['day']
             if day_key in data:
-                data[day_key]['PID'] = song['new_PID']
+                data[day_key] = data[day_key] | {'PID': song['new_PID']}
                 updated_pid_count += 1
         print(f"✅ Updated {updated_pid_count} PIDs")
     
-    # Remove the songs
-    removed_count = 0
-    if songs_to_remove:
-        print(f"\n🗑️  Removing songs...")
-        for song in songs_to_remove:
-            if song['day'] in data:
-                del data[song['day']]
-                removed_count += 1
-    
-    # Renumber the remaining days only if songs were removed
+    # Remove the songs and renumber what's left in one pass, building the
+    # new calendar once instead of deleting from and rebuilding `data`
+    removed_count = len(songs_to_remove)
     if removed_count > 0:
+        print(f"\n🗑️  Removing songs...")
         print(f"\n🔄 Renumbering days to remove gaps...")
-        old_data = data.copy()
-        data.clear()
+        removed_days = {song['day'] for song in songs_to_remove}
         
         # Sort the remaining days by their current day number
-        sorted_days = sorted(old_data.items(), key=lambda x: int(x[0].replace('day', '')))
+        sorted_days = sorted(
+            ((k, v) for k, v in data.items() if k not in removed_days),
+            key=lambda kv: int(kv[0][3:]),
+        )
         
-        # Renumber consecutively starting from day1
-        for new_day_num, (old_day_key, day_content) in enumerate(sorted_days, 1):
-            new_day_key = f"day{new_day_num}"
-            data[new_day_key] = day_content
-            # Update the title to match the new day number
-            data[new_day_key]['title'] = f"Day {new_day_num}"
+        # Renumber consecutively starting from day1, titles to match
+        data = {f"day{i}": v | {"title": f"Day {i}"} for i, (_, v) in enumerate(sorted_days, 1)}
     
     # Save the cleaned calendar
     try:
@@ -801,8 +1057,9 @@ def clean_calendar_from_playlist():
         shutil.copy2(FINAL_FILE, backup_file)
         print(f"📦 Backup saved: {backup_file}")
         
-        # Save cleaned data
+        # Save cleaned data (and retire progress logged against the old numbering)
         save_data(FINAL_FILE, data, js_prefix, js_suffix)
+        save_checkpoint(data)
         
         # Print summary
         if updated_pid_count > 0:
@@ -822,66 +1079,119 @@ def clean_calendar_from_playlist():
     except Exception as e:
         print(f"❌ Error saving cleaned calendar: {e}")
     
-    input("\nPress Enter to continue...")
+    pause()
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PART 2: PIN & RANDOMIZE FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Song data fields of a day entry; song_payload tuples use this order
 SONG_FIELDS = ["src", "song_embed", "PID", "metadata"]
 
 
 def load_data(file_path):
-    """Load calendar_data.js file"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        raw = f.read().strip()
-    if file_path.lower().endswith(".js"):
-        start = raw.index("{")
-        end   = raw.rindex("}") + 1
-        return json.loads(raw[start:end]), raw[:start], raw[end:]
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f), None, None
+    """Load calendar_data.js (memoized until the file changes)"""
+    st = os.stat(file_path)
+    return _load_data_cached(file_path, st.st_mtime_ns, st.st_size)
+
+
+# load_data's result is shared; callers that modify it in place load through
+# here so unsaved edits can't leak into later loads
+def load_data_for_update(file_path):
+    """Load calendar_data.js and drop it from the cache so the caller owns it"""
+    result = load_data(file_path)
+    _load_data_cached.cache_clear()
+    return result
+
+
+@functools.lru_cache(maxsize=4)
+def _load_data_cached(file_path, mtime_ns, size):
+    """Uncached body of load_data (mmapped); mtime_ns and size only key the cache"""
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if not file_path.lower().endswith(".js"):
+            return intern_pids(json_from_bytes(mm[:])), None, None
+        start = mm.find(b"{")
+        end   = mm.rfind(b"}") + 1
+        if start < 0 or end == 0:
+            raise ValueError(f"No JSON object found in {file_path}")
+        js_prefix = mm[:start].decode("utf-8").lstrip()
+        js_suffix = mm[end:].decode("utf-8").rstrip()
+        return intern_pids(json_from_bytes(mm[start:end])), js_prefix, js_suffix
+
+
+def intern_pids(data):
+    """Intern every entry's PID in place and return data"""
+    for entry in data.values():
+        if isinstance(pid := entry.get("PID"), str):
+            entry["PID"] = sys.intern(pid)
+    return data
 
 
 def save_data(file_path, data, js_prefix=None, js_suffix=None):
-    """Save calendar data back to JS file"""
-    json_str = json.dumps(data, indent=2, ensure_ascii=False)
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write((js_prefix or "") + json_str + (js_suffix or ""))
+    """Save calendar data back to JS file atomically"""
+    _load_data_cached.cache_clear()
+    temp_file = file_path + ".tmp"
+    try:
+        with open(temp_file, "wb", buffering=1 << 20) as f:
+            f.write((js_prefix or "").encode("utf-8"))
+            write_json(f, data)
+            f.write((js_suffix or "").encode("utf-8"))
+        os.replace(temp_file, file_path)
+    except Exception:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
 
 
 def load_pins():
-    """Load pins from JSON file"""
+    """Load pins from JSON file as { day_number: PID }
+
+    JSON only has string keys; they're converted here and in save_pins so
+    the rest of the code works with ints.
+    """
     if os.path.isfile(PINS_FILE):
-        with open(PINS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(PINS_FILE, "rb") as f:
+            return {int(day): sys.intern(pid) for day, pid in json_from_bytes(f.read()).items()}
     return {}
 
 
 def save_pins(pins):
-    """Save pins to JSON file"""
-    with open(PINS_FILE, "w", encoding="utf-8") as f:
-        json.dump(pins, f, indent=2)
+    """Save pins to JSON file atomically"""
+    temp_file = PINS_FILE + ".tmp"
+    try:
+        with open(temp_file, "wb") as f:
+            f.write(json_bytes({str(day): pid for day, pid in pins.items()}))
+        os.replace(temp_file, PINS_FILE)
+    except Exception:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+
+
+_DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})$")
 
 
 def date_to_day_num(s):
     """Convert date string to day number"""
     s = s.strip()
-    for fmt in ("%m/%d/%y", "%m/%d/%Y"):
-        try:
-            parsed = datetime.strptime(s, fmt).date()
-            delta  = (parsed - START_DATE).days + 1
-            if delta < 1:
-                raise ValueError(
-                    f"{parsed.strftime('%B %d, %Y')} is before the calendar start "
-                    f"({START_DATE.strftime('%B %d, %Y')})."
-                )
-            return delta, parsed
-        except ValueError as e:
-            if "before the calendar" in str(e):
-                raise
-    raise ValueError(f"Cannot parse '{s}'. Use M/D/YY or M/D/YYYY, e.g. 2/14/26.")
+    m = _DATE_RE.match(s)
+    if not m:
+        raise ValueError(f"Cannot parse '{s}'. Use M/D/YY or M/D/YYYY, e.g. 2/14/26.")
+    month, day, year = (int(g) for g in m.groups())
+    if len(m.group(3)) == 2:
+        year += 2000 if year < 69 else 1900  # same pivot as strptime's %y
+    try:
+        parsed = date(year, month, day)
+    except ValueError:
+        raise ValueError(f"Cannot parse '{s}'. Use M/D/YY or M/D/YYYY, e.g. 2/14/26.") from None
+    delta = (parsed - START_DATE).days + 1
+    if delta < 1:
+        raise ValueError(
+            f"{parsed.strftime('%B %d, %Y')} is before the calendar start "
+            f"({START_DATE.strftime('%B %d, %Y')})."
+        )
+    return delta, parsed
 
 
 def day_label(day_num):
@@ -907,14 +1217,28 @@ def parse_target(raw, total_days):
 
 
 def song_payload(entry):
-    """Extract just the song data fields from a day entry"""
-    return {f: entry.get(f) for f in SONG_FIELDS}
+    """Extract just the song data fields from a day entry, as a SONG_FIELDS tuple"""
+    return entry.get("src"), entry.get("song_embed"), entry.get("PID"), entry.get("metadata")
+
+
+def put_song_payload(dest, payload):
+    """Write a song_payload tuple into a day entry"""
+    dest["src"], dest["song_embed"], dest["PID"], dest["metadata"] = payload
 
 
 def song_summary(entry):
-    """Get readable song summary"""
-    m = entry.get("metadata", {})
-    return f"'{m.get('original_name', '?')}' by {m.get('original_artist', '?')}"
+    """Get readable song summary (reused until the calendar caches are invalidated)"""
+    cached = _summary_cache.get(id(entry))
+    if cached is not None and cached[0] is entry:
+        return cached[1]
+    m = entry.get("metadata")
+    if not m:
+        # Placeholder {} for a PID missing from the calendar - not worth keeping
+        return "'?' by ?"
+    summary = f"'{m.get('original_name', '?')}' by {m.get('original_artist', '?')}"
+    # Keeping the entry alive in the cache stops its id being reused
+    _summary_cache[id(entry)] = (entry, summary)
+    return summary
 
 
 def pid_of(entry):
@@ -922,73 +1246,142 @@ def pid_of(entry):
     return entry.get("PID")
 
 
+# Last build_pid_index / build_day_index / build_search_index results and the
+# calendar dict they were built from
+_pid_index_cache = {"data": None, "index": None}
+_day_index_cache = {"data": None, "index": None}
+_search_index_cache = {"data": None, "rows": None}
+# { id(entry): (entry, song_summary(entry)) }
+_summary_cache = {}
+
+
+def invalidate_calendar_caches():
+    """Forget indexes derived from calendar data; call after changing it in place"""
+    _pid_index_cache["data"] = None
+    _day_index_cache["data"] = None
+    _search_index_cache["data"] = None
+    _summary_cache.clear()
+
+
 def build_pid_index(data):
-    """Returns { PID: day_key } for every entry in data"""
-    return {entry.get("PID"): k for k, entry in data.items() if entry.get("PID")}
+    """Returns { PID: day_key } for every entry in data (reused until data changes)"""
+    if _pid_index_cache["data"] is not data:
+        _pid_index_cache["index"] = {entry.get("PID"): k for k, entry in data.items() if entry.get("PID")}
+        _pid_index_cache["data"] = data
+    return _pid_index_cache["index"]
+
+
+def build_day_index(data):
+    """Returns { day_number: entry } so callers don't build or parse "dayN" keys"""
+    if _day_index_cache["data"] is not data:
+        _day_index_cache["index"] = {int(k[3:]): entry for k, entry in data.items()}
+        _day_index_cache["data"] = data
+    return _day_index_cache["index"]
+
+
+def build_search_index(data):
+    """Lowercased song names per entry (reused until data changes)
+
+    Rows are (day_key, entry, original_name, matched_name, day_number) with
+    both names already lowercased.
+    """
+    if _search_index_cache["data"] is not data:
+        rows = []
+        for k, v in data.items():
+            m  = v.get("metadata", {})
+            on = (m.get("original_name") or "").lower()
+            mn = (m.get("matched_name") or "").lower()
+            rows.append((k, v, on, mn, int(k[3:])))
+        _search_index_cache.update(data=data, rows=rows)
+    return _search_index_cache["rows"]
 
 
 def find_song(data, query):
     """Case-insensitive partial name match"""
     q = query.strip().lower()
-    matches = [
-        (k, v) for k, v in data.items()
-        if q in v.get("metadata", {}).get("original_name", "").lower()
-        or q in v.get("metadata", {}).get("matched_name", "").lower()
-    ]
+    matches = [row for row in build_search_index(data) if q in row[2] or q in row[3]]
     if not matches:
         return None, None
     if len(matches) == 1:
-        return matches[0]
+        return matches[0][:2]
 
-    print(f"\n  Multiple matches for '{query}':")
-    for i, (k, v) in enumerate(matches, 1):
-        n = int(k.replace("day", ""))
-        print(f"    [{i}] Day {n}: {song_summary(v)}")
+    lines = [f"\n  Multiple matches for '{query}':"]
+    lines += [f"    [{i}] Day {n}: {song_summary(v)}" for i, (_, v, _, _, n) in enumerate(matches, 1)]
+    print("\n".join(lines))
     while True:
         c = input("  Pick a number: ").strip()
         if c.isdigit() and 1 <= int(c) <= len(matches):
-            return matches[int(c) - 1]
+            return matches[int(c) - 1][:2]
         print("  Invalid choice.")
 
 
-def apply_pins_and_randomize(data, pins):
-    """Apply pins and randomize unpinned songs"""
-    total    = len(data)
-    all_keys = [f"day{i}" for i in range(1, total + 1)]
+def apply_pins_and_randomize(data, pins, seed=None):
+    """Apply pins and randomize unpinned songs
+
+    Rewrites the song fields of `data` in place and returns it. Every payload
+    is collected before the first write, so moving songs around is safe.
+    Pass `seed` for a repeatable shuffle.
+
+    Raises ValueError, leaving `data` untouched, unless every day has its own
+    PID - otherwise there'd be fewer songs than days to deal them onto.
+    """
+    rng        = random.Random(seed)
+    day_by_num = build_day_index(data)
 
     pid_to_payload = {}
-    for k in all_keys:
-        entry = data[k]
-        pid   = pid_of(entry)
+    days_by_pid    = {}
+    for day_num, entry in day_by_num.items():
+        pid = pid_of(entry)
         if pid:
             pid_to_payload[pid] = song_payload(entry)
+            days_by_pid.setdefault(pid, []).append(day_num)
+
+    if len(pid_to_payload) != len(day_by_num):
+        problems = [
+            f"PID {pid} is on days {', '.join(map(str, days))}"
+            for pid, days in days_by_pid.items() if len(days) > 1
+        ]
+        no_pid = [str(n) for n, entry in day_by_num.items() if not pid_of(entry)]
+        if no_pid:
+            problems.append(f"no PID on day(s) {', '.join(no_pid)}")
+        raise ValueError(f"Can't shuffle: {'; '.join(problems)}.")
+
+    if not pins:
+        # Nothing pinned: a plain shuffle of every song, no pin bookkeeping
+        payloads = list(pid_to_payload.values())
+        rng.shuffle(payloads)
+        for dest, payload in zip(day_by_num.values(), payloads):
+            put_song_payload(dest, payload)
+        invalidate_calendar_caches()
+        return data
 
     pinned_day_payloads = {}
     pinned_pids         = set()
 
-    for day_str, pid in pins.items():
-        day_num = int(day_str)
-        if f"day{day_num}" not in data:
+    for day_num, pid in sorted(pins.items()):
+        if day_num not in day_by_num:
             print(f"  ⚠️  Skipping pin: Day {day_num} not in calendar.")
             continue
         if pid not in pid_to_payload:
             print(f"  ⚠️  Skipping pin for Day {day_num}: song PID '{pid}' not found.")
             continue
+        if pid in pinned_pids:
+            print(f"  ⚠️  Skipping pin for Day {day_num}: song PID '{pid}' is already pinned to an earlier day.")
+            continue
         pinned_day_payloads[day_num] = pid_to_payload[pid]
         pinned_pids.add(pid)
 
     unpinned = [p for pid, p in pid_to_payload.items() if pid not in pinned_pids]
-    random.shuffle(unpinned)
-    unpinned_iter = iter(unpinned)
+    rng.shuffle(unpinned)
+    unpinned_days = [dest for day_num, dest in day_by_num.items() if day_num not in pinned_day_payloads]
 
-    new_data = copy.deepcopy(data)
-    for i in range(1, total + 1):
-        dest_key = f"day{i}"
-        payload  = pinned_day_payloads.get(i) or next(unpinned_iter)
-        for f in SONG_FIELDS:
-            new_data[dest_key][f] = payload[f]
+    for day_num, payload in pinned_day_payloads.items():
+        put_song_payload(day_by_num[day_num], payload)
+    for dest, payload in zip(unpinned_days, unpinned):
+        put_song_payload(dest, payload)
 
-    return new_data
+    invalidate_calendar_caches()
+    return data
 
 
 def show_pins(pins, data):
@@ -997,16 +1390,28 @@ def show_pins(pins, data):
         print("\n  No pins set yet.")
         return
     pid_index = build_pid_index(data)
-    print("\n  Current pins:")
-    for day_str, pid in sorted(pins.items(), key=lambda x: int(x[0])):
-        day_num  = int(day_str)
+    lines = ["\n  Current pins:"]
+    for day_num, pid in sorted(pins.items()):
         src_key  = pid_index.get(pid)
         entry    = data.get(src_key, {}) if src_key else {}
-        print(f"    {day_label(day_num):38s}  ←  {song_summary(entry)}")
+        lines.append(f"    {day_label(day_num):38s}  ←  {song_summary(entry)}")
+    # One write for the whole list instead of a print per pin
+    print("\n".join(lines))
+
+
+def pins_by_pid(pins):
+    """Returns { PID: day_number }, the reverse of pins"""
+    return {pid: day_num for day_num, pid in pins.items()}
 
 
-def add_pin(data, pins):
-    """Add or update a pin"""
+def add_pin(data, pins, pinned_day_by_pid=None):
+    """Add or update a pin
+
+    pinned_day_by_pid is the pins_by_pid() view of pins; pass it to have it
+    kept in sync, otherwise it's built here.
+    """
+    if pinned_day_by_pid is None:
+        pinned_day_by_pid = pins_by_pid(pins)
     total = len(data)
     print()
 
@@ -1018,7 +1423,7 @@ def add_pin(data, pins):
         except ValueError as e:
             print(f"  ⚠️  {e}")
 
-    existing_pid = pins.get(str(day_num))
+    existing_pid = pins.get(day_num)
     if existing_pid:
         pid_index = build_pid_index(data)
         old_entry = data.get(pid_index.get(existing_pid, ""), {})
@@ -1039,23 +1444,25 @@ def add_pin(data, pins):
         print("  ❌  This song has no PID and cannot be pinned.")
         return
 
-    for d, p in list(pins.items()):
-        if p == new_pid and int(d) != day_num:
-            print(f"  ⚠️  That song is already pinned to {day_label(int(d))}.")
-            over = input("  Move pin to new day instead? (y/n): ").strip().lower()
-            if over == "y":
-                del pins[d]
-            else:
-                print("  Cancelled.")
-                return
-            break
+    d = pinned_day_by_pid.get(new_pid)
+    if d is not None and d != day_num:
+        print(f"  ⚠️  That song is already pinned to {day_label(d)}.")
+        over = input("  Move pin to new day instead? (y/n): ").strip().lower()
+        if over == "y":
+            del pins[d]
+        else:
+            print("  Cancelled.")
+            return
 
-    pins[str(day_num)] = new_pid
+    if existing_pid and pinned_day_by_pid.get(existing_pid) == day_num:
+        del pinned_day_by_pid[existing_pid]
+    pins[day_num] = new_pid
+    pinned_day_by_pid[new_pid] = day_num
     print(f"  ✅  Pinned: {song_summary(src_entry)}  →  {label}")
 
 
-def remove_pin(pins, data):
-    """Remove a pin"""
+def remove_pin(pins, data, pinned_day_by_pid=None):
+    """Remove a pin (and its pinned_day_by_pid entry, if given)"""
     if not pins:
         print("\n  No pins to remove.")
         return
@@ -1067,13 +1474,14 @@ def remove_pin(pins, data):
     except ValueError as e:
         print(f"  ⚠️  {e}")
         return
-    key = str(day_num)
-    if key not in pins:
+    if day_num not in pins:
         print(f"  ℹ️  No pin set for {label}.")
         return
     pid_index = build_pid_index(data)
-    old_entry = data.get(pid_index.get(pins[key], ""), {})
-    del pins[key]
+    old_entry = data.get(pid_index.get(pins[day_num], ""), {})
+    pid = pins.pop(day_num)
+    if pinned_day_by_pid is not None and pinned_day_by_pid.get(pid) == day_num:
+        del pinned_day_by_pid[pid]
     print(f"  ✅  Unpinned {label}  (was: {song_summary(old_entry)})")
 
 
@@ -1089,8 +1497,9 @@ def pin_and_randomize_menu():
         print("    Please run Part 1 first to build the calendar.")
         return
 
-    data, js_prefix, js_suffix = load_data(FINAL_FILE)
+    data, js_prefix, js_suffix = load_data_for_update(FINAL_FILE)
     pins = load_pins()
+    pinned_day_by_pid = pins_by_pid(pins)
     print(f"✅  Loaded {len(data)} songs.  📌 {len(pins)} pin(s) active.\n")
 
     while True:
@@ -1104,11 +1513,11 @@ def pin_and_randomize_menu():
         choice = input("  Choice: ").strip()
 
         if choice == "1":
-            add_pin(data, pins)
+            add_pin(data, pins, pinned_day_by_pid)
             save_pins(pins)
 
         elif choice == "2":
-            remove_pin(pins, data)
+            remove_pin(pins, data, pinned_day_by_pid)
             save_pins(pins)
 
         elif choice == "3":
@@ -1121,10 +1530,16 @@ def pin_and_randomize_menu():
             if confirm != "y":
                 print("  Cancelled.")
                 continue
-            new_data = apply_pins_and_randomize(data, pins)
+            try:
+                new_data = apply_pins_and_randomize(data, pins)
+            except ValueError as e:
+                print(f"  ❌  {e}")
+                continue
             save_data(FINAL_FILE, new_data, js_prefix, js_suffix)
+            save_checkpoint(new_data)
             print(f"  ✅  Saved to: {FINAL_FILE}")
-            data, js_prefix, js_suffix = load_data(FINAL_FILE)
+            # What we just wrote is the new state - no need to read it back
+            data = new_data
 
         elif choice == "5":
             print("  Bye!")
@@ -1171,8 +1586,7 @@ def main():
                     confirm = input("\n⚠️  Really rebuild from scratch? Current progress will be lost! (yes/no): ").strip().lower()
                     if confirm == "yes":
                         # Clear the checkpoint to force rebuild
-                        if os.path.exists(CHECKPOINT_FILE):
-                            os.remove(CHECKPOINT_FILE)
+                        clear_checkpoint()
                         success = build_calendar()
                         if success:
                             print("\n✅ Calendar build complete!")
@@ -1208,14 +1622,11 @@ def main():
                 if choice == "1":
                     confirm = input("\n⚠️  Really rebuild? Current calendar will be lost! (yes/no): ").strip().lower()
                     if confirm == "yes":
-                        if os.path.exists(CHECKPOINT_FILE):
-                            os.remove(CHECKPOINT_FILE)
+                        clear_checkpoint()
                         success = build_calendar()
                         if success:
                             print("\n✅ Calendar build complete!")
-                            cont = input("\nContinue to Pin & Randomize? (y/n): ").strip().lower()
-                            if cont == "y":
-                                pin_and_randomize_menu()
+                            offer_pin_and_randomize()
                     else:
                         print("Cancelled.")
                     return
@@ -1233,9 +1644,7 @@ def main():
                     sys.exit(1)
             
             # After building, ask about pin & randomize
-            cont = input("\nContinue to Pin & Randomize? (y/n): ").strip().lower()
-            if cont == "y":
-                pin_and_randomize_menu()
+            offer_pin_and_randomize()
                 
         except Exception as e:
             print(f"⚠️  Error reading calendar file: {e}")
@@ -1243,17 +1652,13 @@ def main():
             success = build_calendar()
             if success:
                 print("\n✅ Calendar build complete!")
-                cont = input("\nContinue to Pin & Randomize? (y/n): ").strip().lower()
-                if cont == "y":
-                    pin_and_randomize_menu()
+                offer_pin_and_randomize()
     else:
         print("No existing calendar found. Starting from Part 1...\n")
         success = build_calendar()
         if success:
             print("\n✅ Calendar build complete!")
-            cont = input("\nContinue to Pin & Randomize? (y/n): ").strip().lower()
-            if cont == "y":
-                pin_and_randomize_menu()
+            offer_pin_and_randomize()
 
 
 if __name__ == "__main__":